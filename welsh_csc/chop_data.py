@@ -4,9 +4,20 @@ import subprocess
 import sys
 import os
 import concurrent.futures
+import contextlib
+from functools import cache
 from pathlib import Path
-from .util import rglob_by_dir
-from .click_ext import report_error, report_exception
+from typing import Callable, Final
+from .util import map_jobs, scan_files
+from .click_ext import progressbar, report_error, report_exception, report_interrupt
+
+
+# The raw audio folders to be chopped for each channel option.
+_TARGETS: Final[dict[str, tuple[str, ...]]] = {
+    "1": ("raw-1ch",),
+    "2": ("raw-2ch",),
+    "1+2": ("raw-1ch", "raw-2ch"),
+}
 
 
 @click.option(
@@ -34,8 +45,7 @@ def chop_data(path: Path, channel: str):
     Uses Mark Huckvale's ProChop utility if the utility is found on the path,
     otherwise falls back to prochoppy to chop the audio files.
     """
-    channels = ["1", "2"] if channel == "1+2" else [channel]
-    targets = [f"raw-{channel}ch" for channel in channels]
+    targets = _TARGETS[channel]
     # Report parameters to user
     click.secho("Chopping raw audio for: ", bold=True, nl=False)
     click.echo(", ".join(click.style(target, fg="yellow") for target in targets))
@@ -53,45 +63,23 @@ def _chop_data(path: Path, target: Path):
         )
         return
     dest_dir = path / Path(str(target).replace("raw", "chopped"))
-    files = rglob_by_dir(source_dir, dest_dir, extensions=(".wav"))
     chop = prochop_file if prochop_available() else prochoppy_file
-    with concurrent.futures.ProcessPoolExecutor(
-        max_workers=min(12, os.cpu_count() or 1)
-    ) as executor:
-        futures: dict[concurrent.futures.Future[None], tuple[Path, Path]] = {}
-        for _, flist in files.items():
-            for (source_file, dest_file) in flist:
-                futures[
-                    executor.submit(chop, source_file, dest_file.parent)
-                ] = (source_file, dest_file)
-        with click.progressbar(
-                length=len(futures),
-                label='Chopping files',
-                show_eta=True,
-                show_pos=True,
-                bar_template=click.style('%(label)s  %(bar)s  %(info)s', dim=True),
-                empty_char=click.style("▓", fg=240, dim=True),
-                fill_char=click.style("█", fg="yellow", dim=False),
-                color=True
-        ) as pbar:  # type: ignore
+    jobs = [
+        (Path(entry.path), dest_dir / os.path.relpath(os.path.dirname(entry.path), source_dir))
+        for entry in scan_files(source_dir, (".wav",))
+    ]
+    workers = min(12, os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        with progressbar(length=len(jobs), label='Chopping files') as pbar:  # type: ignore
             error_stack: dict[tuple[Path, Path], BaseException] = {}
             try:
-                for future in concurrent.futures.as_completed(futures):
+                for job, error in map_jobs(executor, chop, jobs, workers):
                     pbar.update(1)  # type: ignore
-                    if error := future.exception():
-                        err_file = futures[future]
-                        error_stack[err_file] = error
+                    if error:
+                        error_stack[job] = error
                 click.echo()
             except KeyboardInterrupt:
-                click.echo()
-                click.secho(
-                    "Keyboard Interrupt Caught!",
-                    bg="red", fg="white", bold=True, nl=False, err=True
-                )
-                click.secho(
-                    " The process will terminate once all active mono conversions are complete.",
-                    err=True
-                )
+                report_interrupt("chop jobs are complete")
                 executor.shutdown(wait=True, cancel_futures=True)
                 raise
             for files, error in error_stack.items():
@@ -115,6 +103,12 @@ def prochop_file(filepath: Path, dest_dir: Path):
 
 
 def prochoppy_file(filepath: Path, dest_dir: Path):
+    if (prochoppy_main := _load_prochoppy()) is not None:
+        # Run in-process: pool workers import prochoppy once instead of starting a new
+        # interpreter for every file.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            prochoppy_main(filepath, filepath.with_suffix(".txt"), dest_dir)
+        return
     subprocess.run(
         [
             sys.executable,
@@ -127,5 +121,15 @@ def prochoppy_file(filepath: Path, dest_dir: Path):
     )
 
 
+@cache
+def _load_prochoppy() -> Callable[..., None] | None:
+    """Import and return ProChopPy's entry point, or None if it is not installed."""
+    try:
+        from prochoppy.__main__ import main
+    except ImportError:
+        return None
+    return main
+
+
 def prochop_available() -> bool:
     return shutil.which("prochop") is not None
@@ -1,75 +1,8 @@
 import click
-import urllib.request
-import urllib.error
 from functools import partial
+from http import HTTPStatus
 from typing import Container, Final
-
-
-HTTP_STATUS_CODES: Final[dict[int, str]] = {
-    100: "Continue",
-    101: "Switching protocols",
-    102: "Processing",
-    103: "Early Hints",
-    200: "OK",
-    201: "Created",
-    202: "Accepted",
-    203: "Non-Authoritative Information",
-    204: "No Content",
-    205: "Reset Content",
-    206: "Partial Content",
-    207: "Multi-Status",
-    208: "Already Reported",
-    226: "IM Used",
-    300: "Multiple Choices",
-    301: "Moved Permanently",
-    302: "Found",
-    303: "See Other",
-    304: "Not Modified",
-    305: "Use Proxy",
-    306: "Switch Proxy",
-    307: "Temporary Redirect",
-    308: "Permanent Redirect",
-    400: "Bad Request",
-    401: "Unauthorized",
-    402: "Payment Required",
-    403: "Forbidden",
-    404: "Not Found",
-    405: "Method Not Allowed",
-    406: "Not Acceptable",
-    407: "Proxy Authentication Required",
-    408: "Request Timeout",
-    409: "Conflict",
-    410: "Gone",
-    411: "Length Required",
-    412: "Precondition Failed",
-    413: "Payload Too Large",
-    414: "URI Too Long",
-    415: "Unsupported Media Type",
-    416: "Range Not Satisfiable",
-    417: "Expectation Failed",
-    418: "I'm a Teapot",
-    421: "Misdirected Request",
-    422: "Unprocessable Entity",
-    423: "Locked",
-    424: "Failed Dependency",
-    425: "Too Early",
-    426: "Upgrade Required",
-    428: "Precondition Required",
-    429: "Too Many Requests",
-    431: "Request Header Fields Too Large",
-    451: "Unavailable For Legal Reasons",
-    500: "Internal Server Error",
-    501: "Not Implemented",
-    502: "Bad Gateway",
-    503: "Service Unavailable",
-    504: "Gateway Timeout",
-    505: "HTTP Version Not Supported",
-    506: "Variant Also Negotiates",
-    507: "Insufficient Storage",
-    508: "Loop Detected",
-    510: "Not Extended",
-    511: "Network Authentication Required",
-}
+from .remote import http_session
 
 
 class URLParamType(click.ParamType):
@@ -93,58 +26,83 @@ class URLParamType(click.ParamType):
         if self.permitted_schemes and scheme.lower() not in self.permitted_schemes:
             self.fail(f"The URL {scheme!r} is not supported for this parameter")
 
+        import requests
+
         try:
-            with urllib.request.urlopen(value) as _:
-                pass
-        except urllib.error.HTTPError as e:
-            if not self.ignore_http_errors:
-                self.fail(
-                    f"The URL {value!r} returned an HTTP Error ([Error {e.code}] {e.reason})",
-                    param, ctx
-                )
-        except urllib.error.URLError as e:
-            self.fail(f"{value!r} is not a valid URL or cannot be opened ({e.reason})", param, ctx)
+            r = http_session().head(value, allow_redirects=True, timeout=5)
+            if r.status_code in (HTTPStatus.METHOD_NOT_ALLOWED, HTTPStatus.NOT_IMPLEMENTED):
+                # The server doesn't support HEAD; check with a GET but don't read the body.
+                with http_session().get(value, stream=True, timeout=5) as r:
+                    pass
+        except requests.RequestException as e:
+            self.fail(f"{value!r} is not a valid URL or cannot be opened ({e})", param, ctx)
+        if not r.ok and not self.ignore_http_errors:
+            self.fail(
+                f"The URL {value!r} returned an HTTP Error ([Error {r.status_code}] {r.reason})",
+                param, ctx
+            )
 
         return value
 
 
 def report_error(message: str):
-    click.secho("ERROR: ", bold=True, fg="red", nl=False, err=True)
-    click.echo(message, err=True)
+    click.echo(click.style("ERROR: ", bold=True, fg="red") + message, err=True)
 
 
 def report_http_error(url: str, status_code: int):
-    click.secho("ERROR: ", bold=True, fg="red", nl=False, err=True)
-    click.echo("The URL ", nl=False, err=True)
-    click.secho(url, fg="blue", nl=False, err=True)
-    click.echo(" returned an HTTP Error (", nl=False, err=True)
-    click.secho(f"{status_code} {HTTP_STATUS_CODES[status_code]}", fg="yellow", nl=False, err=True)
-    click.echo(")")
+    click.echo(
+        click.style("ERROR: ", bold=True, fg="red")
+        + "The URL " + click.style(url, fg="blue") + " returned an HTTP Error ("
+        + click.style(f"{status_code} {_status_phrase(status_code)}", fg="yellow") + ")",
+        err=True
+    )
+
+
+def _status_phrase(status_code: int) -> str:
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return "Unknown"
 
 
 def report_url_error(url: str, message: str):
-    click.secho("ERROR: ", bold=True, fg="red", nl=False, err=True)
-    click.echo("The URL ", nl=False, err=True)
-    click.secho(url, fg="blue", nl=False, err=True)
-    click.echo(" is not a valid URL or could not be opened (", nl=False, err=True)
-    click.secho(message, fg="yellow", nl=False, err=True)
-    click.echo(")")
+    click.echo(
+        click.style("ERROR: ", bold=True, fg="red")
+        + "The URL " + click.style(url, fg="blue") + " is not a valid URL or could not be opened ("
+        + click.style(message, fg="yellow") + ")",
+        err=True
+    )
 
 
 def report_exception(message: str, exc: BaseException):
-    click.secho("ERROR: ", bold=True, fg="red", nl=False, err=True)
-    click.echo(message, nl=False, err=True)
-    click.echo(" (", nl=False, err=True)
-    click.secho(str(exc), fg="yellow", nl=False, err=True)
-    click.echo(")")
+    click.echo(
+        click.style("ERROR: ", bold=True, fg="red")
+        + message + " (" + click.style(str(exc), fg="yellow") + ")",
+        err=True
+    )
+
+
+def report_interrupt(pending: str):
+    """Report a caught KeyboardInterrupt and which active work will be waited for."""
+    click.echo()
+    click.echo(
+        click.style("Keyboard Interrupt Caught!", bg="red", fg="white", bold=True)
+        + f" The process will terminate once all active {pending}.",
+        err=True
+    )
+
 
+# Progressbar styling, rendered to ANSI once at import rather than for every bar.
+_BAR_TEMPLATE: Final[str] = click.style('%(label)s  %(bar)s  %(info)s', dim=True)
+_EMPTY_CHAR: Final[str] = click.style("▓", fg=240, dim=True)
+_FILL_CHAR: Final[str] = click.style("█", fg="yellow", dim=False)
 
 progressbar = partial(
     click.progressbar,
     show_eta=True,
     show_pos=True,
-    bar_template=click.style('%(label)s  %(bar)s  %(info)s', dim=True),
-    empty_char=click.style("▓", fg=240, dim=True),
-    fill_char=click.style("█", fg="yellow", dim=False),
+    bar_template=_BAR_TEMPLATE,
+    empty_char=_EMPTY_CHAR,
+    fill_char=_FILL_CHAR,
     color=True
 )
@@ -1,13 +1,53 @@
 import click
-import click_spinner
-import requests
-import concurrent.futures
+import json
+import os
+import queue
 import re
-import shutil
-from io import DEFAULT_BUFFER_SIZE
-from pathlib import Path
+import tempfile
+import threading
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import partial
-from .click_ext import URLParamType, report_http_error, report_url_error, report_exception
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Final, Iterator
+from .click_ext import (
+    URLParamType, progressbar, report_error, report_http_error, report_url_error,
+    report_exception, report_interrupt
+)
+from .remote import http_session
+
+if TYPE_CHECKING:
+    import requests
+    from click._termui_impl import ProgressBar
+
+
+# Number of concurrent downloads; kept below the size of the shared connection pool so that
+# every worker thread holds on to a keep-alive connection instead of re-handshaking per file.
+MAX_DOWNLOADS: Final[int] = 16
+# Number of remote directory listings fetched concurrently while indexing the remote tree.
+MAX_INDEX_FETCHES: Final[int] = 16
+# Name of the file (inside each asset folder) caching the remote directory listings and the
+# validators of downloaded files between runs.
+INDEX_CACHE_FILE: Final[str] = ".welsh_csc_index.json"
+
+# The assets (folders) to be downloaded for each combination of component and channel.
+_TARGETS: Final[dict[tuple[str, str], tuple[str, ...]]] = {
+    ("all", "1"): ("raw-1ch", "chopped-1ch"),
+    ("all", "2"): ("raw-2ch", "chopped-2ch"),
+    ("all", "1+2"): ("raw-1ch", "chopped-1ch", "raw-2ch", "chopped-2ch"),
+    ("raw", "1"): ("raw-1ch",),
+    ("raw", "2"): ("raw-2ch",),
+    ("raw", "1+2"): ("raw-1ch", "raw-2ch"),
+    ("chopped", "1"): ("chopped-1ch",),
+    ("chopped", "2"): ("chopped-2ch",),
+    ("chopped", "1+2"): ("chopped-1ch", "chopped-2ch"),
+}
+
+# Matches the entries of an Apache mod_autoindex listing in its plain list format (?F=0).
+_APACHE_INDEX_RE: Final[re.Pattern[str]] = re.compile(r'^<li><a href="([\w\-. %]+/?)">', re.M)
+# Matches the first byte position in the Content-Range header of a 206 response.
+_CONTENT_RANGE_RE: Final[re.Pattern[str]] = re.compile(r"bytes (\d+)-")
 
 
 @click.option(
@@ -30,21 +70,23 @@ from .click_ext import URLParamType, report_http_error, report_url_error, report
     default="https://data.ling101.com/welsh-csc/data/", show_default=False,
     help="URL for the remote server from which to fetch data. [default: https://data.ling101.com]"
 )
+@click.option(
+    "--fail-fast", is_flag=True, default=False,
+    help="Stop all downloads as soon as one of them fails."
+)
 @click.argument("component", type=click.Choice(["all", "raw", "chopped"], case_sensitive=False))
-def get_data(component: str, path: Path, channel: str, remote: str):
+def get_data(component: str, path: Path, channel: str, remote: str, fail_fast: bool):
     """Retrieve the Welsh CSC data from remote host.
 
-    Existing data files will not be overwritten. To replace files, delete them first (or rename
-    them by adding *.bak at the end).
+    Existing data files are kept if they are complete and unchanged on the remote. Partial files
+    left by an interrupted run are resumed, and files that differ from the remote (in size, or
+    because they changed there since they were downloaded) are downloaded again and overwritten.
 
     The data path must already exist and be writeable. By default ./data is assumed
     (relative to the current working directory). Depending on the provided options, subdirectories
     with the names raw-1ch, raw-2ch, chopped-1ch, chopped-2ch may be created.
     """
-    # Compute the assets (folders) to be downloaded...
-    components = ["raw", "chopped"] if component == "all" else [component]
-    channels = ["1", "2"] if channel == "1+2" else [channel]
-    targets = [f"{component}-{channel}ch" for channel in channels for component in components]
+    targets = _TARGETS[(component, channel)]
     # Report parameters to user
     click.secho("Assets to be downloaded: ", bold=True, nl=False)
     click.echo(", ".join(click.style(target, fg="yellow") for target in targets))
@@ -54,109 +96,348 @@ def get_data(component: str, path: Path, channel: str, remote: str):
         remote_url = f"{remote}{target}" if remote.endswith("/") else f"{remote}/{target}"
         destination = path / target
         destination.mkdir(exist_ok=True)
-        _get_data(remote_url, destination)
+        _get_data(remote_url, destination, fail_fast)
 
 
-def _get_data(remote_url: str, destination: Path):
+def _get_data(remote_url: str, destination: Path, fail_fast: bool = False):
     click.secho("Fetching files from remote: ", bold=True, nl=False)
     click.secho(remote_url, bold=True, fg="blue")
-    index = _build_remote_index(remote_url)
-    if not index:
-        return
-    operands = zip(index, map(lambda s: destination / s[len(remote_url)+1:], index))
-    session = requests.Session()
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {
-            executor.submit(
-                _download_file, remote, local, session=session
-            ): remote for remote, local in operands
-        }
-        errors: dict[str, BaseException] = {}
-        with click.progressbar(
-            length=len(futures),
-            label='Downloading files',
-            show_eta=True,
-            show_pos=True,
-            bar_template=click.style('%(label)s  %(bar)s  %(info)s', dim=True),
-            empty_char=click.style("▓", fg=240, dim=True),
-            fill_char=click.style("█", fg="yellow", dim=False),
-            color=True
-        ) as pbar:  # type: ignore
-            try:
-                for future in concurrent.futures.as_completed(futures):
-                    pbar.update(1)  # type: ignore
-                    if error := future.exception():
-                        err_url = futures[future]
-                        errors[err_url] = error
-            except KeyboardInterrupt:
-                click.echo()
-                click.secho(
-                    "Keyboard Interrupt Caught!",
-                    bg="red", fg="white", bold=True, nl=False, err=True
-                )
-                click.secho(
-                    " The process will terminate once all active downloads have finished.",
-                    err=True
-                )
-                executor.shutdown(wait=True, cancel_futures=True)
-                raise
-        for err_url, error in errors.items():
-            if isinstance(error, requests.HTTPError):
-                report_http_error(err_url, error.response.status_code)
-            elif isinstance(error, IOError):
-                report_exception("Could not open file for writing", error)
-            else:
-                report_url_error(err_url, str(error))
+    session = http_session()
+    index_cache = _load_index_cache(destination)
+    fetch_dir = partial(_fetch_dir, session=session, cache=index_cache["dirs"])
+    # Directory listings and downloads both post their futures to this queue once done, so the
+    # files of a directory start downloading while the rest of the tree is still being indexed.
+    completed: queue.SimpleQueue[Future[Any]] = queue.SimpleQueue()
+    listings: dict[Future[Any], str] = {}
+    downloads: dict[Future[Any], str] = {}
+    index_errors: list[str] = []
+    errors: dict[str, BaseException] = {}
+    # Set to make active downloads stop after their current chunk.
+    cancel = threading.Event()
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_INDEX_FETCHES) as crawler, \
+                ThreadPoolExecutor(max_workers=MAX_DOWNLOADS) as downloader, \
+                progressbar(length=0, label='Downloading files') as pbar, \
+                _cancel_on_interrupt(cancel, crawler, downloader):  # type: ignore
+            list_dir = partial(_submit, crawler, completed, fetch_dir)
+            download = partial(
+                _submit, downloader, completed, _download_file,
+                session=session, cancel=cancel, validators=index_cache["files"]
+            )
+            listings[list_dir(remote_url)] = remote_url
+            while (listings or downloads) and not (fail_fast and errors):
+                future = completed.get()
+                if future in downloads:
+                    _on_download(future, downloads, errors, pbar)
+                    continue
+                for file in _on_listing(future, listings, index_errors, list_dir, pbar):
+                    downloads[download(file, destination / file[len(remote_url)+1:])] = file
+            if errors and fail_fast:
+                _cancel_all(cancel, crawler, downloader)
+    finally:
+        # Saved even when interrupted, so partial downloads keep the validators to resume them.
+        _save_index_cache(destination, index_cache)
+    _report_errors(index_errors, errors, fail_fast)
+
+
+def _on_download(
+    future: Future[Any], downloads: dict[Future[Any], str], errors: dict[str, BaseException],
+    pbar: "ProgressBar[Any]"
+):
+    """Record a finished download (and its error, if any) and advance the progressbar."""
+    pbar.update(1)
+    if error := future.exception():
+        errors[downloads[future]] = error
+    del downloads[future]
+
+
+def _on_listing(
+    future: Future[Any], listings: dict[Future[Any], str], index_errors: list[str],
+    list_dir: Callable[[str], Future[Any]], pbar: "ProgressBar[Any]"
+) -> list[str]:
+    """Queue the subdirectories of a finished listing and return its files for download."""
+    target_url = listings.pop(future)
+    if (listing := future.result()) is None:
+        index_errors.append(target_url)
+        return []
+    subdirs, files = listing
+    for subdir in subdirs:
+        listings[list_dir(subdir)] = subdir
+    _extend_progressbar(pbar, len(files))
+    return files
+
+
+@contextmanager
+def _cancel_on_interrupt(cancel: threading.Event, *executors: Executor) -> Iterator[None]:
+    """Report a KeyboardInterrupt in the block and cancel all work on executors before exiting."""
+    try:
+        yield
+    except KeyboardInterrupt:
+        report_interrupt("downloads have been stopped")
+        _cancel_all(cancel, *executors)
+        raise
+
+
+def _report_errors(index_errors: list[str], errors: dict[str, BaseException], fail_fast: bool):
+    """Report the listings that couldn't be fetched and the downloads that failed.
+
+    With fail_fast, a failed download also aborts the command (with a non-zero exit status).
+    """
+    for err_url in index_errors:
+        report_error(
+            "Could not obtain index for remote directory at " + click.style(err_url, fg="blue")
+        )
+    from requests import HTTPError
+
+    for err_url, error in errors.items():
+        if isinstance(error, HTTPError):
+            report_http_error(err_url, error.response.status_code)
+        elif isinstance(error, IOError):
+            report_exception("Could not open file for writing", error)
+        else:
+            report_url_error(err_url, str(error))
+    if errors and fail_fast:
+        raise click.Abort()
+
+
+def _cancel_all(cancel: threading.Event, *executors: Executor):
+    """Cancel all pending work on executors and signal active downloads to stop."""
+    cancel.set()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(
+    executor: Executor, completed: queue.SimpleQueue[Future[Any]], fn: Callable[..., Any],
+    *args: Any, **kwargs: Any
+) -> Future[Any]:
+    """Submit fn to executor and post the resulting future to completed once it is done."""
+    future = executor.submit(fn, *args, **kwargs)
+    future.add_done_callback(completed.put)
+    return future
+
+
+def _extend_progressbar(pbar: "ProgressBar[Any]", n: int):
+    """Grow the length of an active progressbar by n steps."""
+    pbar.length = (pbar.length or 0) + n
+    pbar.finished = pbar.pos >= pbar.length
 
 
 def _download_file(
     remote_url: str,
     destination: Path,
-    chunk_size: int = DEFAULT_BUFFER_SIZE,  # Alternative sensible option: 1_048_576,
-    session: requests.Session | None = None
+    chunk_size: int = 1_048_576,
+    session: "requests.Session | None" = None,
+    cancel: threading.Event | None = None,
+    validators: dict[str, str] | None = None
 ):
+    """Download remote_url to destination.
+
+    validators maps remote URLs to the ETag/Last-Modified they were last downloaded with, and
+    is updated with those of every full response. If destination already exists and a
+    validator is known, only the missing tail is requested, conditional on the validator
+    (If-Range): partial files from an interrupted run are resumed and complete files are left
+    untouched, while a file that changed on the remote is sent in full and rewritten. Setting
+    cancel stops the download after the current chunk (raising CancelledError) and keeps the
+    partial file.
+    """
+    validators = validators if validators is not None else {}
     destination.parent.mkdir(parents=True, exist_ok=True)
-    with destination.open("wb", chunk_size*5, ) as fp:
-        getter = session.get if session else requests.get
-        r = getter(remote_url, stream=True)
+    offset = destination.stat().st_size if destination.exists() else 0
+    # Ask for the bytes as stored: the audio does not compress usefully, and byte ranges and
+    # Content-Length then refer to the file itself rather than to an encoded representation.
+    headers = {"Accept-Encoding": "identity"}
+    if validator := (validators.get(remote_url) if offset else None):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    session = session or http_session()
+    with session.get(remote_url, stream=True, headers=headers) as r:
+        if r.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            # Read the (empty) body so that the connection goes back to the pool.
+            r.content
+            return
         r.raise_for_status()
-        r.raw.read = partial(r.raw.read, decode_content=True)
-        shutil.copyfileobj(r.raw, fp)
-
-
-def _build_remote_index(remote_url: str) -> list[str]:
-    index_stack: list[str] = [remote_url]
-    item_stack: list[str] = []
-    err_stack: list[str] = []
-    click.secho("Building index... ", dim=True, nl=False)
-    with requests.Session() as session:
-        with click_spinner.spinner():  # type: ignore
-            while index_stack:
-                target_url = index_stack.pop()
-                target_url += (not target_url.endswith("/")) * "/"
-                r = session.get(target_url, params={"F": 0})
-                if r.status_code == requests.codes.ok:
-                    items = _parse_apache_index(r.text)
-                    for item in items:
-                        item = f"{target_url}{item}"
-                        if item.endswith("/"):
-                            index_stack.append(item)
-                        else:
-                            item_stack.append(item)
-                else:
-                    err_stack.append(target_url)
-    click.echo(f"{len(item_stack)} files to fetch")
-    for err_url in err_stack:
-        click.secho("ERROR: ", bold=True, fg="red", nl=False, err=True)
-        click.echo("Could not obtain index for remote directory at ", nl=False, err=True)
-        click.secho(err_url, fg="blue", err=True)
-    return item_stack
+        if r.status_code == HTTPStatus.PARTIAL_CONTENT:
+            _check_resumed_at(r, offset, validators, remote_url)
+            mode = "ab"
+        else:
+            _record_validator(r, validators, remote_url)
+            if _is_complete(r, offset, validator):
+                # The unread body is the whole file, so dropping the connection is cheaper. This
+                # only happens once per file, as later runs send its validator and get a 416.
+                return
+            mode = "wb"
+        r.raw.decode_content = False
+        with destination.open(mode) as fp:
+            _copy_write_behind(r.raw, fp, chunk_size, cancel)
 
 
-def _parse_apache_index(html: str) -> list[str]:
-    matches = re.findall(
-        r"^<li><a href\=\"([\w\-\.\ \%]+/?)\">",
-        html,
-        flags=re.M
+def _check_resumed_at(
+    response: "requests.Response", offset: int, validators: dict[str, str], remote_url: str
+):
+    """Raise a ValueError unless the partial response continues the local file at offset.
+
+    The validator of remote_url is dropped in that case, so the next run downloads it in full.
+    """
+    if _content_range_start(response) != offset:
+        validators.pop(remote_url, None)
+        raise ValueError(f"The server didn't resume the download at byte {offset}")
+
+
+def _record_validator(response: "requests.Response", validators: dict[str, str], url: str):
+    """Record the If-Range validator of a full response for url (or forget it if it has none)."""
+    if validator := _range_validator(response):
+        validators[url] = validator
+    else:
+        validators.pop(url, None)
+
+
+def _copy_write_behind(
+    source: BinaryIO, fp: BinaryIO, chunk_size: int, cancel: threading.Event | None = None
+):
+    """Copy source to fp, writing each chunk on a helper thread while the next one is read.
+
+    This keeps the connection busy while a slow destination (USB drive, network share) is
+    being written to; at most two chunks are held in memory at any one time. If cancel is set
+    the copy stops after the current chunk with a CancelledError.
+    """
+    # Plain read() chunks on purpose: urllib3's readinto() is implemented on top of read()
+    # and copies the chunk into the target buffer, so recycling a preallocated buffer
+    # would add a copy per chunk rather than save an allocation.
+    chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=2)
+    failures: list[BaseException] = []
+    writer = threading.Thread(target=_write_chunks, args=(chunks, fp, failures), daemon=True)
+    writer.start()
+    try:
+        while not failures and (chunk := source.read(chunk_size)):
+            if cancel is not None and cancel.is_set():
+                raise CancelledError()
+            chunks.put(chunk)
+    finally:
+        chunks.put(None)
+        writer.join()
+    if failures:
+        raise failures[0]
+
+
+def _write_chunks(
+    chunks: queue.Queue[bytes | None], fp: BinaryIO, failures: list[BaseException]
+):
+    """Write the chunks from the queue to fp until None is received, recording any failure."""
+    try:
+        for chunk in iter(chunks.get, None):
+            fp.write(chunk)
+    except BaseException as e:
+        failures.append(e)
+        while chunks.get() is not None:  # Keep draining so that the reader never blocks
+            pass
+
+
+def _is_complete(
+    response: "requests.Response", local_size: int, validator: str | None = None
+) -> bool:
+    """Whether a full (non-ranged) response has the same size as the existing local file.
+
+    If the local file was downloaded with a known validator, the response must match it too.
+    """
+    return (
+        local_size > 0
+        and response.status_code == HTTPStatus.OK
+        and response.headers.get("Content-Length") == str(local_size)
+        and (validator is None or _range_validator(response) == validator)
     )
-    return matches or []
+
+
+def _range_validator(response: "requests.Response") -> str | None:
+    """Return the validator of response usable in an If-Range header (if any).
+
+    Weak ETags aren't allowed in If-Range, so Last-Modified is used in their place.
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _content_range_start(response: "requests.Response") -> int | None:
+    """Return the first byte position of the Content-Range of response (if any)."""
+    match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _fetch_dir(
+    target_url: str, session: "requests.Session", cache: dict[str, dict[str, Any]] | None = None
+) -> tuple[list[str], list[str]] | None:
+    """Fetch one remote directory listing and split it into (subdirectories, files).
+
+    If cache holds validators (ETag/Last-Modified) for the listing from an earlier run, the
+    request is made conditional and a 304 Not Modified response reuses the cached entries.
+    Listings served with validators are recorded in cache. Returns None if the listing could
+    not be obtained.
+    """
+    target_url += (not target_url.endswith("/")) * "/"
+    cached = cache.get(target_url, {}) if cache is not None else {}
+    headers = {
+        header: cached[key]
+        for header, key in (("If-None-Match", "etag"), ("If-Modified-Since", "last_modified"))
+        if cached.get(key)
+    }
+    from requests import RequestException
+
+    try:
+        r = session.get(target_url, params={"F": 0}, headers=headers)
+    except RequestException:
+        return None
+    if r.status_code == HTTPStatus.NOT_MODIFIED and "children" in cached:
+        items = cached["children"]
+    elif r.status_code == HTTPStatus.OK:
+        items = _parse_apache_index(r.text)
+        if cache is not None:
+            _cache_listing(cache, target_url, r, items)
+    else:
+        return None
+    subdirs = [f"{target_url}{item}" for item in items if item.endswith("/")]
+    files = [f"{target_url}{item}" for item in items if not item.endswith("/")]
+    return subdirs, files
+
+
+def _cache_listing(
+    cache: dict[str, dict[str, Any]], target_url: str, response: "requests.Response",
+    items: list[str]
+):
+    """Record the entries of a listing in cache, if it was served with validators."""
+    if "ETag" in response.headers or "Last-Modified" in response.headers:
+        cache[target_url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "children": items,
+        }
+
+
+def _load_index_cache(destination: Path) -> dict[str, dict[str, Any]]:
+    """Load the remote directory listings and file validators cached in destination.
+
+    Returns a dict with the listings under "dirs" and the file validators under "files".
+    """
+    try:
+        cache = json.loads((destination / INDEX_CACHE_FILE).read_bytes())
+        return {"dirs": dict(cache["dirs"]), "files": dict(cache.get("files", {}))}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {"dirs": {}, "files": {}}
+
+
+def _save_index_cache(destination: Path, cache: dict[str, dict[str, Any]]):
+    """Atomically write the cached listings and file validators to destination."""
+    fd, tmp_name = tempfile.mkstemp(dir=destination, prefix=INDEX_CACHE_FILE, suffix=".tmp")
+    try:
+        # Encoded up front and written in one go: json.dump would issue a write per token.
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(json.dumps(cache).encode("utf-8"))
+        os.replace(tmp_name, destination / INDEX_CACHE_FILE)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _parse_apache_index(html: str) -> list[str]:
+    return [match.group(1) for match in _APACHE_INDEX_RE.finditer(html)]
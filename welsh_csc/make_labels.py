@@ -2,10 +2,11 @@ from typing import Collection
 import click
 import click_spinner
 from pathlib import Path
+import os
 import shutil
 import concurrent.futures
 from .click_ext import report_error, progressbar, report_exception
-from .util import map_stimulus_to_ascii
+from .util import map_jobs, map_stimulus_to_ascii, scan_files
 
 
 @click.option(
@@ -33,7 +34,7 @@ def make_labels(path: Path):
             f"couldn't be found. Try running the {click.style('get-meta', fg='green', bold=True)} "
             "command first."
         )
-    stimuli = stimulus_file.read_text(encoding="utf-8").splitlines()
+    stimuli = stimulus_file.read_bytes().decode("utf-8").splitlines()
     click.secho("Making labels for ", bold=True, nl=False)
     click.secho(len(stimuli), fg="yellow", nl=False)
     click.secho(" stimuli ", bold=True)
@@ -47,60 +48,93 @@ def make_labels(path: Path):
 
 
 def make_label_files(path: Path, stimuli: Collection[str]):
-    with progressbar(stimuli, label="Making label files") as pbar:  # type: ignore
-        dest_dir = path / "meta" / "labels"
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        for stimulus in pbar:
-            stimulus: str
-            make_label_file(dest_dir, stimulus)
+    dest_dir = path / "meta" / "labels"
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    # Stimuli sharing an ASCII alias would write the same label files concurrently, so only the
+    # last of them is kept (as when the files were written one after another).
+    by_alias = {map_stimulus_to_ascii(stimulus): stimulus for stimulus in stimuli}
+    # Writing the label files is bound by file system syscalls, which release the GIL, so a
+    # thread pool keeps the disk busy without the cost of spawning processes.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=32) as executor:
+        futures = {
+            executor.submit(make_label_file, dest_dir, stimulus): stimulus
+            for stimulus in by_alias.values()
+        }
+        with progressbar(length=len(futures), label="Making label files") as pbar:  # type: ignore
+            error_stack: dict[str, BaseException] = {}
+            for future in concurrent.futures.as_completed(futures):
+                pbar.update(1)  # type: ignore
+                if error := future.exception():
+                    error_stack[futures[future]] = error
+            for stimulus, error in error_stack.items():
+                report_exception(
+                    f"Couldn't make label files for '{click.style(stimulus, fg='yellow')}'", error
+                )
 
 
 def make_label_file(label_path: Path, stimulus: str):
+    """Write the label files <alias>-1.lab to <alias>-4.lab for stimulus into label_path.
+
+    The four repetitions share the same label, so it is written once and the other three files
+    are hard links to it (or copies where the file system doesn't support links). Linked files
+    share their contents: they must never be edited in place, as an edit to one would change
+    all four. To change a label, edit meta/stimuli.txt and run make-labels again (labels next
+    to the recordings are separate copies and can be edited).
+    """
     ascii_alias = map_stimulus_to_ascii(stimulus)
     stimulus = f"DYWEDA {stimulus.upper()} UNWAITH ETO"
-    files = {label_path / f"{ascii_alias}-{n}.lab" for n in (1, 2, 3, 4)}
-    for file in files:
-        with file.open("w", encoding="utf-8") as fp:
-            fp.write(stimulus)
+    first = label_path / f"{ascii_alias}-1.lab"
+    # A label is only a few bytes, so it is written with a single os.write rather than through
+    # a buffered file object.
+    fd = os.open(first, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, stimulus.encode("utf-8"))
+    finally:
+        os.close(fd)
+    for n in (2, 3, 4):
+        file = label_path / f"{ascii_alias}-{n}.lab"
+        file.unlink(missing_ok=True)
+        try:
+            os.link(first, file)
+        except FileExistsError:
+            raise
+        except OSError:
+            # The file system can't hard link this file (errors differ between platforms).
+            shutil.copyfile(first, file)
 
 
 def add_labels_to_recordings(search_path: Path, label_path: Path):
     component = click.style(search_path.name, fg="yellow")
-    labels = {label.stem for label in label_path.glob("*.lab")}
-    candidate_stack: list[Path] = list(search_path.iterdir())
-    file_stack: list[Path] = []
+    with os.scandir(label_path) as entries:
+        labels = {entry.name[:-4] for entry in entries if entry.name.endswith(".lab")}
     click.secho(f"Finding audio files for {component}... ", dim=True, nl=False)
     with click_spinner.spinner():  # type: ignore
-        while candidate_stack:
-            candidate = candidate_stack.pop()
-            if candidate.is_dir():
-                candidate_stack.extend(candidate.iterdir())
-            elif candidate.suffix == ".wav" and candidate.stem in labels:
-                file_stack.append(candidate)
+        # Paths are built from the plain strings of the scan, without a Path per recording.
+        file_stack = [
+            (os.path.join(label_path, f"{entry.name[:-4]}.lab"), f"{entry.path[:-4]}.lab")
+            for entry in scan_files(search_path, (".wav",)) if entry.name[:-4] in labels
+        ]
     click.echo(f"{len(file_stack)} files to be labelled")
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        futures = {
-            executor.submit(
-                _copy_file_with_stat,
-                label_path / f"{file.stem}.lab",
-                file.with_suffix(".lab")
-            ): file
-            for file in file_stack
-        }
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
         with progressbar(
             length=len(file_stack),
             label=f"Adding labels for {component}"
         ) as pbar:  # type: ignore
-            error_stack: dict[Path, BaseException] = {}
-            for future in concurrent.futures.as_completed(futures):
+            error_stack: dict[tuple[str, str], BaseException] = {}
+            for job, error in map_jobs(executor, _copy_label, file_stack, workers):
                 pbar.update(1)  # type: ignore
-                if error := future.exception():
-                    err_path = futures[future]
-                    error_stack[err_path] = error
+                if error:
+                    error_stack[job] = error
             for _, error in error_stack.items():
                 report_exception("Couldn't copy label file", error)
 
 
-def _copy_file_with_stat(src: Path, dst: Path):
+def _copy_label(src: str | Path, dst: str | Path):
+    """Copy the label file src to dst.
+
+    The labels were just generated by make_label_files, so their timestamps and permissions
+    carry no information and are not copied along. Each recording gets its own copy, as the
+    labels next to the recordings are written to in place later on (e.g. by make-mono).
+    """
     shutil.copyfile(src, dst)
-    shutil.copystat(src, dst)
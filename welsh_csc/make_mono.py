@@ -3,9 +3,13 @@ import wave
 import concurrent.futures
 import os
 from pathlib import Path
-from struct import unpack, pack
-from .click_ext import report_exception
-from .util import copy_files
+from typing import Final
+from .click_ext import progressbar, report_exception, report_interrupt
+from .util import copy_files, map_jobs
+
+
+# memoryview formats matching the sample widths (in bytes) supported by extract_first_channel.
+_SAMPLE_FORMATS: Final[dict[int, str]] = {1: "B", 2: "H", 4: "I"}
 
 
 @click.option(
@@ -48,47 +52,21 @@ def _make_mono(component: str, path: Path):
     dest_path = path / component.replace("-2ch", "-1ch")
     dest_path.mkdir(exist_ok=True)
     files = [
-        (source, Path(str(source).replace(str(source_path), str(dest_path))))
-        for source in (
-            source for sources in (subpath.glob("*.wav") for subpath in source_path.iterdir())
-            for source in sources
-        )
+        (source, dest_path / source.relative_to(source_path))
+        for subpath in source_path.iterdir() for source in subpath.glob("*.wav")
     ]
-    with concurrent.futures.ProcessPoolExecutor(
-        max_workers=min(4, os.cpu_count() or 1)
-    ) as executor:
-        futures = {
-            executor.submit(extract_first_channel, *file): file
-            for file in files
-        }
-        with click.progressbar(
-                length=len(futures),
-                label='Monoising files',
-                show_eta=True,
-                show_pos=True,
-                bar_template=click.style('%(label)s  %(bar)s  %(info)s', dim=True),
-                empty_char=click.style("▓", fg=240, dim=True),
-                fill_char=click.style("█", fg="yellow", dim=False),
-                color=True
-        ) as pbar:  # type: ignore
+    workers = min(4, os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        with progressbar(length=len(files), label='Monoising files') as pbar:  # type: ignore
             error_stack: dict[tuple[Path, Path], BaseException] = {}
             try:
-                for future in concurrent.futures.as_completed(futures):
+                for file, error in map_jobs(executor, extract_first_channel, files, workers):
                     pbar.update(1)  # type: ignore
-                    if error := future.exception():
-                        err_file = futures[future]
-                        error_stack[err_file] = error
+                    if error:
+                        error_stack[file] = error
                 click.echo()
             except KeyboardInterrupt:
-                click.echo()
-                click.secho(
-                    "Keyboard Interrupt Caught!",
-                    bg="red", fg="white", bold=True, nl=False, err=True
-                )
-                click.secho(
-                    " The process will terminate once all active mono conversions are complete.",
-                    err=True
-                )
+                report_interrupt("mono conversions are complete")
                 executor.shutdown(wait=True, cancel_futures=True)
                 raise
             for files, error in error_stack.items():
@@ -102,8 +80,12 @@ def extract_first_channel(source_file: Path, dest_file: Path):
     dest_file.parent.mkdir(parents=True, exist_ok=True)
     try:
         with wave.open(str(source_file), "rb") as sfp:
+            # Checked before the destination is opened, so no empty file is left behind.
+            if (sample_format := _SAMPLE_FORMATS.get(sfp.getsampwidth())) is None:
+                raise ValueError(f"Unsupported sample width ({sfp.getsampwidth()} bytes)")
             with wave.open(str(dest_file), "wb") as dfp:
                 dfp: wave.Wave_write
+                nchannels = sfp.getnchannels()
                 dfp.setparams(sfp.getparams())
                 dfp.setnchannels(1)
                 snframes = sfp.getnframes()
@@ -112,8 +94,9 @@ def extract_first_channel(source_file: Path, dest_file: Path):
                     chunk = min(32_768, remaining)
                     remaining -= chunk
                     sframes = sfp.readframes(chunk)
-                    sdata = unpack("%dh" % 2*chunk, sframes)
-                    ddata = pack("%dh" % chunk, *sdata[0::2])
+                    # Keep the first sample of every frame, i.e. the first channel, without
+                    # unpacking the samples into Python ints.
+                    ddata = memoryview(sframes).cast(sample_format)[0::nchannels].tobytes()
                     dfp.writeframes(ddata)
     except Exception as e:
         raise Exception(
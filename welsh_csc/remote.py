@@ -0,0 +1,35 @@
+from functools import cache
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    import requests
+
+
+# Size of the shared HTTP connection pool (covers index crawling and downloads running together).
+MAX_CONNECTIONS: Final[int] = 32
+
+
+@cache
+def http_session() -> "requests.Session":
+    """Return the HTTP session shared by all requests to the remote host.
+
+    The index, the data files and the URL preflight all live on the same host, so routing
+    everything through one session lets later requests reuse kept-alive connections instead
+    of paying a fresh TCP/TLS handshake each time. The pool blocks when exhausted, so callers
+    wait for a kept-alive connection rather than opening (and then discarding) extra ones.
+    Transient gateway errors are retried.
+    """
+    # requests is imported here rather than at module level as it makes up the bulk of the
+    # start-up time of the CLI and only the commands talking to the remote host need it.
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_maxsize=MAX_CONNECTIONS,
+        pool_block=True,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,7 +1,25 @@
 import click
+import concurrent.futures
+import os
 import shutil
+from functools import partial
 from pathlib import Path
-from typing import Collection
+from typing import Any, Callable, Collection, Final, Iterator, Sequence
+from .click_ext import progressbar
+
+
+# Translation table replacing the Welsh diacritics in stimuli with plain ASCII letters
+# (circumflexed vowels are doubled, all other accents are dropped).
+_ASCII_MAP: Final[dict[int, str]] = str.maketrans({
+    'â': 'aa', 'ê': 'ee', 'î': 'ii', 'ô': 'oo', 'û': 'uu', 'ŵ': 'ww', 'ŷ': 'yy',
+    'Â': 'AA', 'Ê': 'EE', 'Î': 'II', 'Ô': 'OO', 'Û': 'UU', 'Ŵ': 'WW', 'Ŷ': 'YY',
+    'ä': 'a',  'ë': 'e',  'ï': 'i',  'ö': 'o',  'ü': 'u',  'ẅ': 'w',  'ÿ': 'y',
+    'Ä': 'A',  'Ë': 'E',  'Ï': 'I',  'Ö': 'O',  'Ü': 'U',  'Ẅ': 'W',  'Ÿ': 'Y',
+    'á': 'a',  'é': 'e',  'í': 'i',  'ó': 'o',  'ú': 'u',  'ẃ': 'w',  'ý': 'y',
+    'Á': 'A',  'É': 'E',  'Í': 'I',  'Ó': 'O',  'Ú': 'U',  'Ẃ': 'W',  'Ý': 'Y',
+    'à': 'a',  'è': 'e',  'ì': 'i',  'ò': 'o',  'ù': 'u',  'ẁ': 'w',  'ỳ': 'y',
+    'À': 'A',  'È': 'E',  'Ì': 'I',  'Ò': 'O',  'Ù': 'U',  'Ẁ': 'W',  'Ỳ': 'Y',
+})
 
 
 def copy_files(source_dir: Path, dest_dir: Path, extensions: Collection[str] | None = None):
@@ -20,52 +38,61 @@ def copy_files(source_dir: Path, dest_dir: Path, extensions: Collection[str] | N
     click.secho(source_dir, fg="yellow")
     click.secho("Destination directory: ", bold=True, nl=False)
     click.secho(dest_dir, fg="yellow")
-    files = rglob_by_dir(source_dir, dest_dir, extensions)
-    nfiles = sum(len(flist) for _, flist in files.items())
-    with click.progressbar(
-            length=nfiles,
-            label='Copying files',
-            show_eta=True,
-            show_pos=True,
-            bar_template=click.style('%(label)s  %(bar)s  %(info)s', dim=True),
-            empty_char=click.style("▓", fg=240, dim=True),
-            fill_char=click.style("█", fg="yellow", dim=False),
-            color=True
-    ) as pbar:  # type: ignore
-        for rel_dir, flist in files.items():
-            (dest_dir / rel_dir).mkdir(parents=True, exist_ok=True)
-            for src_file, dest_file in flist:
-                shutil.copyfile(src_file, dest_file)
-                shutil.copystat(src_file, dest_file)
+    pairs = [
+        (entry.path, os.path.join(dest_dir, os.path.relpath(entry.path, source_dir)))
+        for entry in scan_files(source_dir, tuple(extensions))
+    ]
+    for directory in {os.path.dirname(dest) for _, dest in pairs}:
+        os.makedirs(directory, exist_ok=True)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        with progressbar(length=len(pairs), label='Copying files') as pbar:  # type: ignore
+            for _ in executor.map(lambda pair: shutil.copy2(*pair), pairs):
                 pbar.update(1)  # type: ignore
 
 
-def rglob_by_dir(
-    source_dir: Path,
-    dest_dir: Path | None = None,
-    extensions: Collection[str] | None = None,
-    base_dir: Path | None = None
-) -> dict[Path, set[tuple[Path, ...]]]:
-    """Recusively enumerate files matching extension on path by subdirectory."""
-    extensions = extensions or {""}
-    extensions = tuple(extensions)
-    if base_dir and not source_dir.is_relative_to(base_dir):
-        raise ValueError(f"Source dir {source_dir} not relative to base dir {base_dir}")
-    paths: dict[Path, set[tuple[Path, ...]]] = {}
-    relative_dir = source_dir.relative_to(base_dir) if base_dir else source_dir
-    for file in source_dir.iterdir():
-        if file.is_dir():
-            new_dest_dir = dest_dir / file.name if dest_dir else Path(file.name)
-            subpaths = rglob_by_dir(file, new_dest_dir, extensions, base_dir)
-            for subpath in subpaths:
-                paths[subpath] = subpaths[subpath]
-        elif str(file).endswith(extensions):
-            if relative_dir not in paths:
-                paths[relative_dir] = set()
-            paths[relative_dir].add(
-                (file, rebase_path(file, source_dir, dest_dir)) if dest_dir else (file,)
-            )
-    return paths
+def map_jobs(
+    executor: concurrent.futures.Executor,
+    fn: Callable[..., Any],
+    jobs: Sequence[tuple[Any, ...]],
+    workers: int
+) -> Iterator[tuple[tuple[Any, ...], Exception | None]]:
+    """Run fn(*job) for each of jobs on executor, yielding every job with its exception (if any).
+
+    Exceptions are returned rather than raised, so that one failing job doesn't end the map.
+    Process pools get the jobs in batches to amortise the pickling/IPC cost of dispatching
+    thousands of small tasks one by one (thread pools ignore the chunksize).
+    """
+    return executor.map(
+        partial(_safe_call, fn), jobs, chunksize=max(1, len(jobs) // (workers * 4))
+    )
+
+
+def _safe_call(
+    fn: Callable[..., Any], job: tuple[Any, ...]
+) -> tuple[tuple[Any, ...], Exception | None]:
+    try:
+        fn(*job)
+    except Exception as e:
+        return job, e
+    return job, None
+
+
+def scan_files(
+    root: str | Path, extensions: tuple[str, ...] = ("",)
+) -> Iterator[os.DirEntry[str]]:
+    """Recursively yield the directory entries of the files below root matching extensions.
+
+    Directories are read with os.scandir, so entry types and names come straight from the
+    directory listing instead of a stat call and a Path per entry.
+    """
+    dir_stack: list[str | Path] = [root]
+    while dir_stack:
+        with os.scandir(dir_stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dir_stack.append(entry.path)
+                elif entry.name.endswith(extensions):
+                    yield entry
 
 
 def rebase_path(path: Path, source_base: Path, target_base: Path) -> Path:
@@ -75,16 +102,4 @@ def rebase_path(path: Path, source_base: Path, target_base: Path) -> Path:
 
 
 def map_stimulus_to_ascii(string: str):
-    mapping: dict[str, str] = {
-        'â': 'aa', 'ê': 'ee', 'î': 'ii', 'ô': 'oo', 'û': 'uu', 'ŵ': 'ww', 'ŷ': 'yy',
-        'Â': 'AA', 'Ê': 'EE', 'Î': 'II', 'Ô': 'OO', 'Û': 'UU', 'Ŵ': 'WW', 'Ŷ': 'YY',
-        'ä': 'a',  'ë': 'e',  'ï': 'i',  'ö': 'o',  'ü': 'u',  'ẅ': 'w',  'ÿ': 'y',
-        'Ä': 'A',  'Ë': 'E',  'Ï': 'I',  'Ö': 'O',  'Ü': 'U',  'Ẅ': 'W',  'Ÿ': 'Y',
-        'á': 'a',  'é': 'e',  'í': 'i',  'ó': 'o',  'ú': 'u',  'ẃ': 'w',  'ý': 'y',
-        'Á': 'A',  'É': 'E',  'Í': 'I',  'Ó': 'O',  'Ú': 'U',  'Ẃ': 'W',  'Ý': 'Y',
-        'à': 'a',  'è': 'e',  'ì': 'i',  'ò': 'o',  'ù': 'u',  'ẁ': 'w',  'ỳ': 'y',
-        'À': 'A',  'È': 'E',  'Ì': 'I',  'Ò': 'O',  'Ù': 'U',  'Ẁ': 'W',  'Ỳ': 'Y',
-    }
-    for k, v in mapping.items():
-        string = string.replace(k, v)
-    return string
+    return string.translate(_ASCII_MAP)